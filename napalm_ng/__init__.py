@@ -0,0 +1,7 @@
+"""napalm-ng: prototype for the next generation of napalm."""
+
+from napalm_ng.async_base import AsyncBaseNetworkDriver
+from napalm_ng.base import BaseNetworkDriver
+from napalm_ng.pool import ConnectionPool
+
+__all__ = ["AsyncBaseNetworkDriver", "BaseNetworkDriver", "ConnectionPool"]
@@ -0,0 +1,168 @@
+"""Asyncio variant of the napalm-ng base driver.
+
+Mirrors the abstract surface of :class:`napalm_ng.base.BaseNetworkDriver`
+as coroutines so a driver can be implemented on a single coroutine-based
+transport (e.g. ``asyncssh.connect()`` plus ``conn.create_process()`` to
+keep one channel open across a ``cli`` batch) and callers can fan out to
+hundreds of devices with ``asyncio.gather`` on one OS thread instead of a
+thread per device.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class AsyncBaseNetworkDriver(ABC):
+    """Abstract async driver that every coroutine-based driver derives from."""
+
+    #: Platform identifier set by subclasses (e.g. ``"ios"``).
+    platform = None
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        """
+        :param hostname: (str) IP or FQDN of the device you want to connect to.
+        :param username: (str) Username you want to use.
+        :param password: (str) Password.
+        :param timeout: (int) Time in seconds to wait for the device to respond.
+        :param optional_args: (dict) Pass additional arguments to the
+            underlying driver. ``keepalive_interval`` (seconds between
+            transport keepalive probes, default ``30``, ``0`` disables) and
+            ``keepalive_count_max`` (unanswered probes before the session is
+            declared dead, default ``3``) are understood by the base class;
+            see :meth:`_apply_keepalive`.
+        """
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.optional_args = optional_args if optional_args is not None else {}
+        self.keepalive_interval = self.optional_args.get("keepalive_interval", 30)
+        self.keepalive_count_max = self.optional_args.get("keepalive_count_max", 3)
+        self.device = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    @staticmethod
+    async def gather(drivers, coro, limit=50):
+        """
+        Runs *coro(driver)* for every driver concurrently, at most *limit* at a time.
+
+        The cap exists so that fanning out does not open more simultaneous
+        unauthenticated connections than the remote sshd allows (its
+        ``MaxStartups`` setting starts dropping connections beyond that);
+        keep *limit* comfortably below it.
+
+        :param drivers: Iterable of driver instances.
+        :param coro: Coroutine function taking a single driver.
+        :param limit: Maximum number of drivers being worked on at once.
+        :return: List of results in the drivers' iteration order.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _bounded(driver):
+            async with semaphore:
+                return await coro(driver)
+
+        return await asyncio.gather(*(_bounded(driver) for driver in drivers))
+
+    def _apply_keepalive(self, conn):
+        """
+        Arms transport-level keepalives on the asyncssh connection *conn* according to
+        ``self.keepalive_interval`` / ``self.keepalive_count_max``, so idle sessions are not
+        silently dropped by stateful firewalls. ``open()`` implementations call this right
+        after connecting; a zero interval leaves keepalives off.
+        """
+        if not self.keepalive_interval:
+            return
+        conn.set_keepalive(self.keepalive_interval, self.keepalive_count_max)
+
+    @abstractmethod
+    async def open(self):
+        """
+        Opens a connection to the device.
+        """
+
+    @abstractmethod
+    async def close(self):
+        """
+        Closes the connection to the device.
+        """
+
+    @abstractmethod
+    async def is_alive(self):
+        """
+        Returns a flag with the connection state.
+        Depends on the nature of API used by each driver.
+        """
+
+    @abstractmethod
+    async def load_replace_candidate(self, filename=None, config=None):
+        """
+        Populates the candidate configuration. You can populate it from a file or from a string.
+        If you send both a filename and a string containing the configuration, the file takes
+        precedence.
+
+        If you use this method the existing configuration will be replaced entirely by the
+        candidate configuration once you commit the changes. This method will not change the
+        configuration by itself.
+
+        :param filename: Path to the file containing the desired configuration. By default is None.
+        :param config: String containing the desired configuration.
+        :raise ReplaceConfigException: If there is an error on the configuration sent.
+        """
+
+    @abstractmethod
+    async def load_merge_candidate(self, filename=None, config=None):
+        """
+        Populates the candidate configuration. You can populate it from a file or from a string.
+        If you send both a filename and a string containing the configuration, the file takes
+        precedence.
+
+        If you use this method the existing configuration will be merged with the candidate
+        configuration once you commit the changes. This method will not change the configuration
+        by itself.
+
+        :param filename: Path to the file containing the desired configuration. By default is None.
+        :param config: String containing the desired configuration.
+        :raise MergeConfigException: If there is an error on the configuration sent.
+        """
+
+    @abstractmethod
+    async def compare_config(self):
+        """
+        :return: A string showing the difference between the running configuration and the
+            candidate configuration. The running_config is loaded automatically just before doing
+            the comparison so there is no need for you to do it.
+        """
+
+    @abstractmethod
+    async def commit_config(self, message=""):
+        """
+        Commits the changes requested by the method load_replace_candidate or load_merge_candidate.
+
+        :param message: Optional - configuration session commit message
+        """
+
+    @abstractmethod
+    async def discard_config(self):
+        """
+        Discards the configuration loaded into the candidate.
+        """
+
+    @abstractmethod
+    async def rollback(self):
+        """
+        If changes were made, revert changes to the original state.
+        """
+
+    @abstractmethod
+    async def cli(self, commands):
+        """
+        Will execute an iterable of commands and return the output in a dictionary format using
+        the command as the key. Any iterable of strings is accepted, not just a list.
+        """
@@ -0,0 +1,653 @@
+"""Base class for the napalm-ng network drivers.
+
+Ported from the classic napalm ``NetworkDriver`` surface; the actual
+transports live in the per-platform subclasses.
+"""
+
+import builtins
+import functools
+import hashlib
+import mmap
+import os
+import re
+import select
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from napalm_ng import exceptions
+from napalm_ng import pool
+
+# Name sets used to classify raised exceptions, precomputed once so the
+# error path does O(1) membership tests instead of rebuilding dir() lists
+# on every raise. vars() skips the sort dir() performs, and only actual
+# exception classes are kept so helper functions or constants added to the
+# exceptions module can never shadow an unknown exception's name.
+# dir(builtins) also works regardless of whether __builtins__ is a dict or
+# a module in the importing context.
+_EXC_NAMES = frozenset(
+    name
+    for name, obj in vars(exceptions).items()
+    if isinstance(obj, type) and issubclass(obj, BaseException)
+)
+_BUILTIN_NAMES = frozenset(dir(builtins))
+_KNOWN = _EXC_NAMES | _BUILTIN_NAMES
+
+
+def _warn_unknown(name):
+    """
+    Cold path of :meth:`BaseNetworkDriver._raise_clean`: asks the user to file a bug for an
+    exception type napalm-ng does not recognize. Kept out of the hot path so the rethrow of
+    known exceptions stays a single membership test plus raise.
+    """
+    epilog = (
+        "napalm-ng didn't catch this exception ({0}). Please, fill a bugfix on "
+        "https://github.com/napalm-automation/napalm-ng/issues\n"
+        "Don't forget to include this traceback.".format(name)
+    )
+    sys.stderr.write(epilog + "\n")
+
+
+def _locked(method):
+    """
+    Serializes *method* on the instance's channel lock.
+
+    A device has a single prompt, so two threads interleaving writes on one driver corrupt
+    each other's output; an uncontended RLock acquire costs next to nothing. The base class
+    guards ``cli``, ``_pipelined_cli`` and ``compare_config``; subclasses must decorate their
+    own overrides of these and of ``load_replace_candidate``, ``load_merge_candidate``,
+    ``commit_config``, ``discard_config`` and ``rollback`` (any method that touches the shared
+    channel). The lock is reentrant, so guarded methods may call each other freely. Note that
+    concurrent callers serialize per driver instance — the correct behavior, since the device
+    itself processes one command at a time.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._chan_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class BaseNetworkDriver(ABC):
+    """Abstract driver that every platform driver derives from.
+
+    The class declares ``__slots__``: a fleet-wide fan-out holds thousands
+    of driver instances, and slotted attributes drop the per-instance
+    ``__dict__`` and make attribute access a fixed-offset load. Subclasses
+    that add instance attributes must declare their own ``__slots__``
+    (an empty tuple if they add none) to keep the benefit.
+    """
+
+    __slots__ = (
+        "hostname",
+        "username",
+        "password",
+        "timeout",
+        "optional_args",
+        "keepalive_interval",
+        "keepalive_count_max",
+        "device",
+        "_session",
+        "_use_pool",
+        "_candidate_bytes",
+        "_cand_hash",
+        "_last_diff",
+        "_prompt_re",
+        "_prompt",
+        "_chan_lock",
+        "_last_heartbeat",
+    )
+
+    #: Platform identifier set by subclasses (e.g. ``"ios"``); part of the
+    #: connection-pool key.
+    platform = None
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        """
+        :param hostname: (str) IP or FQDN of the device you want to connect to.
+        :param username: (str) Username you want to use.
+        :param password: (str) Password.
+        :param timeout: (int) Time in seconds to wait for the device to respond.
+        :param optional_args: (dict) Pass additional arguments to the
+            underlying driver.  Arguments understood by the base class:
+
+            * ``port`` (int) -- transport port, defaults to ``22``.
+            * ``use_pool`` (bool) -- when true, ``open()`` implementations
+              should try :meth:`_acquire_pooled_session` before building a
+              new transport and ``close()`` should hand the live session
+              back via :meth:`_release_pooled_session`, so repeated
+              open/close cycles against the same device skip the SSH
+              handshake.
+            * ``keepalive_interval`` (int) -- seconds between transport
+              keepalive probes, defaults to ``30``; ``0`` disables them.
+              Idle sessions otherwise get silently dropped by stateful
+              firewalls/NAT, and the next call pays a full reconnect (or a
+              ``BrokenPipeError``). ``open()`` implementations wire this in
+              via :meth:`_apply_keepalive`.
+            * ``keepalive_count_max`` (int) -- unanswered keepalives before
+              the transport declares the session dead, defaults to ``3``.
+        """
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.optional_args = optional_args if optional_args is not None else {}
+        self.device = None
+        self._session = None
+        self._use_pool = bool(self.optional_args.get("use_pool", False))
+        self.keepalive_interval = self.optional_args.get("keepalive_interval", 30)
+        self.keepalive_count_max = self.optional_args.get("keepalive_count_max", 3)
+        self._candidate_bytes = None
+        self._cand_hash = None
+        self._last_diff = None
+        self._prompt_re = None
+        self._prompt = None
+        self._chan_lock = threading.RLock()
+        self._last_heartbeat = None
+
+    def __enter__(self):
+        try:
+            self.open()
+            return self
+        except BaseException as exc:
+            self._raise_clean(exc)
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            self.close()
+        except Exception:
+            # A close() failing on an already-dead socket must not mask the
+            # exception that is unwinding the with-block.
+            if exc_type is None:
+                raise
+        if exc_type is not None:
+            raise exc_value.with_traceback(exc_traceback)
+
+    @staticmethod
+    def _raise_clean(exc):
+        """
+        Check whether *exc* is a napalm-ng exception or a builtin one; if it
+        is neither, ask the user to file a bug before re-raising the
+        original exception.
+        """
+        name = type(exc).__name__
+        if name in _KNOWN:
+            raise exc.with_traceback(exc.__traceback__)
+        _warn_unknown(name)
+        raise exc.with_traceback(exc.__traceback__)
+
+    def _pool_key(self):
+        """Key identifying this device/transport in the shared pool."""
+        return (
+            self.hostname,
+            self.optional_args.get("port", 22),
+            self.username,
+            self.platform,
+        )
+
+    def _acquire_pooled_session(self):
+        """Return a live pooled session for this device, or ``None``.
+
+        ``open()`` implementations call this first and only build a fresh
+        transport when nothing usable is pooled.  Always returns ``None``
+        when pooling is not enabled for this driver.
+        """
+        if not self._use_pool:
+            return None
+        self._session = pool.acquire(self._pool_key())
+        return self._session
+
+    def _release_pooled_session(self):
+        """Hand the live session back to the pool instead of tearing it down.
+
+        ``close()`` implementations call this first and only close the
+        transport for real when it returns ``False``.
+        """
+        if not self._use_pool or self._session is None:
+            return False
+        pool.release(self._pool_key(), self._session)
+        self._session = None
+        return True
+
+    @classmethod
+    def open_many(cls, targets, concurrency=8, **common):
+        """
+        Instantiates and opens one driver per target in parallel and returns them as
+        ``{hostname: driver}``. Opening sequentially leaves each handshake waiting on network
+        round-trips; a thread pool overlaps them, while a bounded semaphore around ``open()``
+        keeps the number of simultaneous unauthenticated connections below the remote sshd's
+        ``MaxStartups`` threshold — keep *concurrency* at or under a third of that setting.
+
+        Across hundreds of devices an unreachable one is the expected case, not the
+        exception, so a failed ``open()`` never aborts the batch: the raised exception is
+        returned in place of that device's driver (as ``asyncio.gather`` does with
+        ``return_exceptions=True``) and every successfully opened session stays usable.
+        Callers split the two with ``isinstance(value, Exception)``.
+
+        :param targets: Iterable of ``(hostname, username, password, kwargs)`` tuples; the
+            trailing ``kwargs`` dict is optional and overrides *common* per device.
+        :param concurrency: Maximum number of simultaneous ``open()`` handshakes.
+        :param common: Keyword arguments applied to every instantiation (e.g. ``timeout``).
+        :return: ``{hostname: driver}``, with the exception instead of the driver for
+            devices that failed to open.
+        """
+        semaphore = threading.BoundedSemaphore(concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(cls._open_one, semaphore, target, common): target[0]
+                for target in targets
+            }
+            results = {}
+            for future, hostname in futures.items():
+                try:
+                    results[hostname] = future.result()
+                except Exception as exc:
+                    results[hostname] = exc
+            return results
+
+    @classmethod
+    def _open_one(cls, semaphore, target, common):
+        """Builds a single driver from an ``open_many`` target and opens it."""
+        hostname, username, password = target[:3]
+        kwargs = dict(common)
+        if len(target) > 3 and target[3]:
+            kwargs.update(target[3])
+        driver = cls(hostname, username, password, **kwargs)
+        with semaphore:
+            driver.open()
+        return driver
+
+    @abstractmethod
+    def open(self):
+        """
+        Opens a connection to the device.
+
+        Implementations driving an interactive shell channel MUST set ``self._prompt`` (bytes)
+        before returning — typically via :meth:`_detect_prompt` — and should call
+        :meth:`_compile_prompt` once after the banner is read and store the result on
+        ``self._prompt_re``, so later reads reuse the compiled pattern. ``cli`` and
+        ``_run_one`` implementations must use the cached prompt and never re-detect it
+        per call; on slow links the extra write/read round-trips add up to hundreds of
+        milliseconds per operation.
+        """
+
+    def _apply_keepalive(self, transport):
+        """
+        Arms transport-level keepalives on *transport* according to
+        ``self.keepalive_interval`` / ``self.keepalive_count_max``; a 30-second
+        SSH_MSG_IGNORE heartbeat is orders of magnitude cheaper than the reconnect an idle
+        drop would force. ``open()`` implementations call this right after the transport is
+        authenticated; a zero interval leaves keepalives off. Handles both keepalive
+        signatures in the wild: paramiko's ``set_keepalive(interval)`` and asyncssh's
+        ``set_keepalive(interval, count_max)``.
+        """
+        if not self.keepalive_interval:
+            return
+        try:
+            transport.set_keepalive(self.keepalive_interval, self.keepalive_count_max)
+        except TypeError:
+            # paramiko's set_keepalive only takes the interval
+            transport.set_keepalive(self.keepalive_interval)
+
+    def _detect_prompt(self, chan, attempts=3, settle=0.2):
+        """
+        Learns the device prompt from *chan* and returns it as ``bytes``.
+
+        Sends a single newline, waits up to *settle* seconds for the echo with one
+        ``select()``, and takes the last received line that looks like a prompt
+        (``hostname#`` or ``hostname>``), retrying at most *attempts* times. ``open()``
+        implementations call this once and cache the result on ``self._prompt``; subsequent
+        reads then match with ``bytes.endswith(self._prompt)`` — a C-level comparison —
+        instead of running a regex per read.
+
+        :raise ConnectionException: If no prompt could be detected.
+        """
+        prompt_re = re.compile(rb"[A-Za-z0-9._\-]+[#>]\s*$")
+        buf = bytearray()
+        for _ in range(attempts):
+            chan.send(b"\n")
+            ready, _, _ = select.select([chan], [], [], settle)
+            if not ready:
+                continue
+            buf += chan.recv(65536)
+            for line in reversed(buf.splitlines()):
+                match = prompt_re.search(line)
+                if match:
+                    return match.group(0).rstrip()
+        raise exceptions.ConnectionException(
+            "Unable to detect the prompt on {0}".format(self.hostname)
+        )
+
+    def _compile_prompt(self, hostname_hint):
+        """
+        Returns a compiled bytes pattern matching the device prompt at the start of a line
+        (``hostname#`` or ``hostname>``). Compiling it once in ``open()`` means :meth:`cli`
+        batches never pay a per-read re.compile, and buffered readers can be handed the
+        compiled pattern directly.
+
+        :param hostname_hint: Hostname as it appears in the prompt, typically the device's
+            self-reported name rather than what the caller connected to.
+        """
+        return re.compile(rb"(?m)^" + re.escape(hostname_hint.encode("utf-8")) + rb"[#>]\s*$")
+
+    def _read_until_prompt(self, chan):
+        """
+        Drains *chan* into a ``bytearray`` until ``self._prompt_re`` matches and returns the
+        accumulated bytes, prompt included. The buffer is searched as bytes so partial reads
+        are never decoded; decoding happens once, on the full output, in the caller.
+        """
+        buf = bytearray()
+        while True:
+            data = chan.recv(65536)
+            if not data:
+                break
+            buf += data
+            if self._prompt_re.search(buf) is not None:
+                break
+        return bytes(buf)
+
+    @abstractmethod
+    def close(self):
+        """
+        Closes the connection to the device.
+
+        Implementations must call :meth:`_clear_heartbeat` once the transport is torn down
+        (or handed back to the pool), so :meth:`is_alive` can never serve a cached "alive"
+        for a connection that no longer exists.
+        """
+
+    def is_alive(self):
+        """
+        Returns a flag with the connection state.
+        Depends on the nature of API used by each driver.
+        The state does not reflect only on the connection status (when SSH), it must also take into
+        consideration other parameters, e.g.: NETCONF session might not be usable, although the
+        underlying SSH session is still open etc.
+
+        A transport heartbeat acknowledged within the last ``keepalive_interval`` seconds is
+        proof enough of liveness, so this returns the cached state for free in that window
+        and only goes on the wire via :meth:`_probe_alive` when the signal is stale —
+        monitoring loops polling a large fleet then cost memory reads, not round-trips.
+        """
+        if (
+            self._last_heartbeat is not None
+            and time.monotonic() - self._last_heartbeat < self.keepalive_interval
+        ):
+            return {"is_alive": True}
+        return self._probe_alive()
+
+    def _note_heartbeat(self):
+        """
+        Records a successful transport heartbeat. Keepalive handlers call this whenever a
+        SSH_MSG_IGNORE (or equivalent) response comes back, which is what keeps
+        :meth:`is_alive` off the wire.
+        """
+        self._last_heartbeat = time.monotonic()
+
+    def _clear_heartbeat(self):
+        """
+        Forgets the cached heartbeat. ``close()`` implementations must call this (the
+        counterpart of :meth:`_invalidate_candidate_cache` for the liveness cache), so a
+        monitoring loop doing ``close(); is_alive()`` probes instead of getting a stale
+        ``True`` for up to ``keepalive_interval`` seconds.
+        """
+        self._last_heartbeat = None
+
+    @abstractmethod
+    def _probe_alive(self):
+        """
+        Actively checks the transport and returns the ``{'is_alive': bool}`` flag. Subclasses
+        implement this instead of overriding :meth:`is_alive`, so the heartbeat fast path
+        above applies to every driver.
+        """
+
+    @abstractmethod
+    def load_replace_candidate(self, filename=None, config=None):
+        """
+        Populates the candidate configuration. You can populate it from a file or from a string.
+        If you send both a filename and a string containing the configuration, the file takes
+        precedence.
+
+        If you use this method the existing configuration will be replaced entirely by the
+        candidate configuration once you commit the changes. This method will not change the
+        configuration by itself.
+
+        :param filename: Path to the file containing the desired configuration. By default is None.
+        :param config: String containing the desired configuration.
+        :raise ReplaceConfigException: If there is an error on the configuration sent.
+        """
+
+    @abstractmethod
+    def load_merge_candidate(self, filename=None, config=None):
+        """
+        Populates the candidate configuration. You can populate it from a file or from a string.
+        If you send both a filename and a string containing the configuration, the file takes
+        precedence.
+
+        If you use this method the existing configuration will be merged with the candidate
+        configuration once you commit the changes. This method will not change the configuration
+        by itself.
+
+        :param filename: Path to the file containing the desired configuration. By default is None.
+        :param config: String containing the desired configuration.
+        :raise MergeConfigException: If there is an error on the configuration sent.
+        """
+
+    def _iter_config_payload(self, filename=None, config=None, chunk=65536):
+        """
+        Yields the candidate payload as ``bytes`` slices of at most *chunk* bytes.
+
+        Subclasses call this from ``load_replace_candidate`` / ``load_merge_candidate`` and
+        push each slice straight into the transport. A *filename* is memory-mapped read-only
+        and sliced in place, so even a multi-megabyte chassis config is never materialized as
+        a Python string (the naive ``open(filename).read()`` holds both the raw bytes and the
+        decoded str at once); a *config* string is encoded and chunked the same way. If both
+        are given, the file takes precedence, matching the ``load_*`` contract.
+
+        :param filename: Path to the file containing the desired configuration.
+        :param config: String containing the desired configuration.
+        :param chunk: Maximum size in bytes of each yielded slice.
+        """
+        if filename is not None:
+            with open(filename, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    for i in range(0, size, chunk):
+                        yield mm[i:i + chunk]
+                finally:
+                    mm.close()
+        elif config is not None:
+            payload = config.encode("utf-8")
+            for i in range(0, len(payload), chunk):
+                yield payload[i:i + chunk]
+
+    @_locked
+    def compare_config(self):
+        """
+        :return: A string showing the difference between the running configuration and the
+            candidate configuration. The running_config is loaded automatically just before doing
+            the comparison so there is no need for you to do it.
+
+        The result is memoized on a hash of the candidate payload: as long as subclasses keep
+        ``self._candidate_bytes`` up to date in ``load_replace_candidate`` /
+        ``load_merge_candidate``, repeated calls with an unchanged candidate skip the device
+        round-trip entirely and return the cached diff.
+        """
+        if self._candidate_bytes is not None:
+            cand_hash = hashlib.blake2b(self._candidate_bytes, digest_size=16).digest()
+            if cand_hash == self._cand_hash:
+                return self._last_diff
+            self._last_diff = self._compute_diff()
+            self._cand_hash = cand_hash
+            return self._last_diff
+        return self._compute_diff()
+
+    def _compute_diff(self):
+        """
+        Performs the actual running-vs-candidate comparison on the device. Subclasses implement
+        this instead of overriding :meth:`compare_config`, and set ``self._candidate_bytes``
+        when a candidate is loaded so the memoization above can key on it.
+        """
+        raise NotImplementedError
+
+    def _invalidate_candidate_cache(self):
+        """
+        Forgets the memoized diff. Subclasses must call this from ``commit_config`` and
+        ``discard_config`` (anything that consumes or drops the candidate), so a stale diff is
+        never served afterwards.
+        """
+        self._candidate_bytes = None
+        self._cand_hash = None
+        self._last_diff = None
+
+    @abstractmethod
+    def commit_config(self, message=""):
+        """
+        Commits the changes requested by the method load_replace_candidate or load_merge_candidate.
+
+        Implementations must call :meth:`_invalidate_candidate_cache` once the candidate has
+        been applied.
+
+        :param message: Optional - configuration session commit message
+        """
+
+    @abstractmethod
+    def discard_config(self):
+        """
+        Discards the configuration loaded into the candidate.
+
+        Implementations must call :meth:`_invalidate_candidate_cache` once the candidate has
+        been dropped.
+        """
+
+    @abstractmethod
+    def rollback(self):
+        """
+        If changes were made, revert changes to the original state.
+        """
+
+    @_locked
+    def cli(self, commands):
+        """
+        Will execute an iterable of commands and return the output in a dictionary format using
+        the command as the key. Any iterable of strings is accepted, not just a list.
+
+        Example input::
+
+            ['show clock', 'show calendar']
+
+        Output example::
+
+            {
+                'show calendar': u'22:02:01 UTC Thu Feb 18 2016',
+                'show clock': u'*22:01:51.165 UTC Thu Feb 18 2016',
+            }
+
+        Subclasses normally implement :meth:`_run_one` (or override :meth:`cli_iter` to run
+        the whole batch on one channel) rather than replacing this method. Callers that do
+        not need every output at once should prefer :meth:`cli_iter`, which this method
+        merely collects into a dict.
+
+        :param commands: Iterable of commands to execute.
+        """
+        return dict(self.cli_iter(commands))
+
+    def cli_iter(self, commands):
+        """
+        Executes *commands* and yields ``(command, output)`` pairs as each one completes.
+
+        A ``show tech-support`` style batch easily reaches tens of megabytes; :meth:`cli`
+        materializes every output before returning, while this generator lets callers stream
+        each result to disk holding only one output in memory at a time. The default runs
+        commands one by one through :meth:`_run_one`, taking the channel lock around each
+        command rather than across the whole iteration; pipelining subclasses override this
+        and yield as each sentinel is seen, accumulating output in a ``bytearray`` (``str``
+        ``+=`` goes quadratic on large dumps).
+
+        :param commands: Iterable of commands to execute.
+        """
+        for command in commands:
+            with self._chan_lock:
+                output = self._run_one(command)
+            yield command, output
+
+    def _run_one(self, command):
+        """
+        Executes a single command on the device and returns its output as ``str``. This is the
+        minimal hook a subclass needs for the default :meth:`cli` / :meth:`cli_iter` to work.
+        """
+        raise NotImplementedError
+
+    def _write_channel(self, data):
+        """
+        Writes raw bytes to the persistent shell channel. Subclasses using
+        :meth:`_pipelined_cli` must implement this on top of their transport.
+        """
+        raise NotImplementedError
+
+    def _read_until(self, pattern):
+        """
+        Reads from the persistent shell channel until the compiled bytes *pattern* matches,
+        returning everything read before the match as ``str``. Subclasses using
+        :meth:`_pipelined_cli` must implement this on top of their transport.
+        """
+        raise NotImplementedError
+
+    @_locked
+    def _pipelined_cli(self, commands):
+        """
+        Executes *commands* over a single persistent shell channel instead of opening one
+        channel per command, collapsing N channel handshakes and prompt detections into one.
+
+        All commands are written back-to-back, each followed by an echo of a per-batch
+        sentinel, and the channel is drained once per command up to its sentinel. Subclasses
+        only provide :meth:`_write_channel` and :meth:`_read_until`; pagination must be
+        disabled on the channel first (e.g. ``terminal length 0``), which this helper sends
+        once up front.
+
+        :param commands: Iterable of commands to execute.
+        :return: Dictionary mapping each command to its output.
+        """
+        commands = [command for command in commands]
+        sentinel = "NAPALM-{0}".format(uuid.uuid4().hex)
+        # Anchored like _compile_prompt: only the sentinel alone on its line
+        # matches, never the device's echo of the `echo NAPALM-...` command
+        # line, which also ends with the sentinel.
+        sentinel_re = re.compile(rb"(?m)^" + re.escape(sentinel.encode("utf-8")) + rb"\s*$")
+        self._write_channel("terminal length 0\necho {0}\n".format(sentinel).encode("utf-8"))
+        for command in commands:
+            payload = "{0}\necho {1}\n".format(command, sentinel)
+            self._write_channel(payload.encode("utf-8"))
+        # Drain the pagination-setup echo and output up to the first sentinel
+        # so none of it is attributed to the first command.
+        self._read_until(sentinel_re)
+        output = {}
+        for command in commands:
+            raw = self._read_until(sentinel_re)
+            lines = raw.splitlines()
+            # The first non-blank line is the device's echo of the command,
+            # usually prefixed with the prompt; drop it, along with any line
+            # carrying the sentinel (the echo of the sentinel command itself).
+            while lines and not lines[0].strip():
+                lines.pop(0)
+            if lines and lines[0].strip().endswith(command):
+                lines = lines[1:]
+            body = [
+                line
+                for line in lines
+                if line.strip() != command and sentinel not in line
+            ]
+            output[command] = "\n".join(body).strip("\n")
+        return output
+
+    #: Re-exported so subclasses can guard their overrides with
+    #: ``@BaseNetworkDriver._locked``.
+    _locked = staticmethod(_locked)
@@ -0,0 +1,33 @@
+"""napalm-ng exceptions."""
+
+
+class NapalmException(Exception):
+    """Base exception class for every error raised by napalm-ng."""
+
+
+class ConnectionException(NapalmException):
+    """Unable to connect to the device."""
+
+
+class ConnectionClosedException(ConnectionException):
+    """The device closed the connection mid-session."""
+
+
+class ReplaceConfigException(NapalmException):
+    """Problem loading a candidate for a configuration replace."""
+
+
+class MergeConfigException(NapalmException):
+    """Problem loading a candidate for a configuration merge."""
+
+
+class CommitError(NapalmException):
+    """The device rejected the requested commit."""
+
+
+class SessionLockedException(NapalmException):
+    """The configuration session is locked by another user."""
+
+
+class CommandErrorException(NapalmException):
+    """The device reported an error while executing a command."""
@@ -0,0 +1,143 @@
+"""Shared connection pool for napalm-ng drivers.
+
+Re-opening a device pays the full TCP + key-exchange + authentication
+handshake, typically one to three seconds.  Workloads that touch the same
+device repeatedly (poll loops, per-task Ansible modules) can instead hand
+the live session back on ``close()`` and pick it up again on the next
+``open()``.
+
+Pooling is opt-in per driver (``optional_args={"use_pool": True}``).  The
+pool itself is shared module-wide and keyed on
+``(hostname, port, username, platform)`` so different credentials or
+platforms never share a transport.
+
+The defaults can be tuned through environment variables:
+
+* ``NAPALM_POOL_MAX`` -- maximum number of pooled sessions (default 100).
+* ``NAPALM_POOL_IDLE`` -- seconds a session may sit idle before it is
+  discarded (default 300).
+* ``NAPALM_POOL_MAX_AGE`` -- seconds after which a session is retired even
+  if recently used (default 3600).
+"""
+
+import collections
+import os
+import threading
+import time
+
+POOL_MAX = int(os.environ.get("NAPALM_POOL_MAX", 100))
+POOL_IDLE = int(os.environ.get("NAPALM_POOL_IDLE", 300))
+POOL_MAX_AGE = int(os.environ.get("NAPALM_POOL_MAX_AGE", 3600))
+
+_PooledSession = collections.namedtuple("_PooledSession", "session last_used created")
+
+
+def _probe(session):
+    """Best-effort liveness check; returns ``False`` on any transport error.
+
+    Paramiko-style transports are probed with ``send_ignore()`` and
+    NETCONF managers with a bare ``get()``; sessions exposing neither are
+    assumed alive.
+    """
+    try:
+        send_ignore = getattr(session, "send_ignore", None)
+        if send_ignore is not None:
+            send_ignore()
+            return True
+        get = getattr(session, "get", None)
+        if get is not None:
+            get()
+            return True
+    except Exception:
+        return False
+    return True
+
+
+def _dispose(session):
+    """Close *session*, ignoring errors from already-dead transports."""
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool(object):
+    """Thread-safe pool of live transport sessions, keyed per device.
+
+    Entries are stored as ``{key: deque[(session, last_used, created)]}``
+    guarded by a single lock; acquire and release never hold the lock
+    while touching the wire.
+    """
+
+    def __init__(self, max_size=POOL_MAX, idle_timeout=POOL_IDLE, max_age=POOL_MAX_AGE):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._size = 0
+        # creation times of sessions currently checked out, so a session
+        # released back to the pool keeps aging from its original open().
+        self._checked_out = {}
+
+    def acquire(self, key):
+        """Return a live pooled session for *key*, or ``None``.
+
+        Sessions past their idle timeout or maximum age are discarded, and
+        candidates are probed with a transport no-op so a dead socket is
+        never handed out.
+        """
+        while True:
+            with self._lock:
+                bucket = self._sessions.get(key)
+                if not bucket:
+                    return None
+                entry = bucket.pop()
+                self._size -= 1
+            now = time.monotonic()
+            if now - entry.last_used > self.idle_timeout or now - entry.created > self.max_age:
+                _dispose(entry.session)
+                continue
+            if not _probe(entry.session):
+                _dispose(entry.session)
+                continue
+            with self._lock:
+                self._checked_out[id(entry.session)] = entry.created
+            return entry.session
+
+    def release(self, key, session):
+        """Return *session* to the pool; it is closed if the pool is full."""
+        now = time.monotonic()
+        with self._lock:
+            created = self._checked_out.pop(id(session), now)
+            if self._size < self.max_size:
+                entry = _PooledSession(session, now, created)
+                self._sessions.setdefault(key, collections.deque()).append(entry)
+                self._size += 1
+                return
+        _dispose(session)
+
+    def drain(self):
+        """Close and forget every pooled session."""
+        with self._lock:
+            buckets = self._sessions
+            self._sessions = {}
+            self._size = 0
+            self._checked_out.clear()
+        for bucket in buckets.values():
+            for entry in bucket:
+                _dispose(entry.session)
+
+
+#: Process-wide pool shared by every driver with ``use_pool`` enabled.
+default_pool = ConnectionPool()
+
+
+def acquire(key):
+    """Shortcut for :meth:`ConnectionPool.acquire` on the default pool."""
+    return default_pool.acquire(key)
+
+
+def release(key, session):
+    """Shortcut for :meth:`ConnectionPool.release` on the default pool."""
+    return default_pool.release(key, session)
@@ -0,0 +1,79 @@
+"""Shared fakes for the napalm-ng test suite."""
+
+import pytest
+
+from napalm_ng.base import BaseNetworkDriver
+from napalm_ng.exceptions import ConnectionException
+
+
+class FakeSession:
+    """Stands in for a paramiko-style transport in pool tests."""
+
+    def __init__(self):
+        self.closed = False
+        self.probes = 0
+
+    def send_ignore(self):
+        self.probes += 1
+        if self.closed:
+            raise ConnectionException("dead transport")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDriver(BaseNetworkDriver):
+    """Concrete driver backed by in-memory state instead of a device."""
+
+    __slots__ = ("opened", "diffs_computed", "probe_results")
+    platform = "fake"
+
+    def __init__(self, hostname="localhost", username="user", password="pw", **kwargs):
+        super().__init__(hostname, username, password, **kwargs)
+        self.opened = False
+        self.diffs_computed = 0
+        self.probe_results = []
+
+    def open(self):
+        self._session = self._acquire_pooled_session() or FakeSession()
+        self.opened = True
+
+    def close(self):
+        if not self._release_pooled_session() and self._session is not None:
+            self._session.close()
+            self._session = None
+        self._clear_heartbeat()
+        self.opened = False
+
+    def load_replace_candidate(self, filename=None, config=None):
+        self._candidate_bytes = b"".join(
+            self._iter_config_payload(filename=filename, config=config)
+        )
+
+    def load_merge_candidate(self, filename=None, config=None):
+        self.load_replace_candidate(filename=filename, config=config)
+
+    def commit_config(self, message=""):
+        self._invalidate_candidate_cache()
+
+    def discard_config(self):
+        self._invalidate_candidate_cache()
+
+    def rollback(self):
+        pass
+
+    def _compute_diff(self):
+        self.diffs_computed += 1
+        return "diff #{0}".format(self.diffs_computed)
+
+    def _run_one(self, command):
+        return command.upper()
+
+    def _probe_alive(self):
+        result = {"is_alive": bool(self.probe_results and self.probe_results.pop(0))}
+        return result
+
+
+@pytest.fixture
+def driver():
+    return FakeDriver()
@@ -0,0 +1,397 @@
+"""Tests for the concrete logic in napalm_ng.base.BaseNetworkDriver."""
+
+import re
+
+import pytest
+
+from napalm_ng import base as base_module
+from napalm_ng.base import BaseNetworkDriver
+from napalm_ng.exceptions import ConnectionException
+
+from .conftest import FakeDriver, FakeSession
+
+
+def test_base_is_abstract():
+    with pytest.raises(TypeError):
+        BaseNetworkDriver("h", "u", "p")
+
+
+def test_slots_no_instance_dict(driver):
+    assert not hasattr(driver, "__dict__")
+    with pytest.raises(AttributeError):
+        driver.stray_attribute = 1
+
+
+# --- cli / cli_iter -------------------------------------------------------
+
+
+def test_cli_accepts_any_iterable(driver):
+    assert driver.cli(iter(["show clock"])) == {"show clock": "SHOW CLOCK"}
+    assert driver.cli(c for c in ("a", "b")) == {"a": "A", "b": "B"}
+
+
+def test_cli_iter_streams_lazily():
+    ran = []
+
+    class Recording(FakeDriver):
+        __slots__ = ()
+
+        def _run_one(self, command):
+            ran.append(command)
+            return command
+
+    iterator = Recording().cli_iter(["a", "b"])
+    assert ran == []
+    assert next(iterator) == ("a", "a")
+    assert ran == ["a"]
+    assert list(iterator) == [("b", "b")]
+
+
+# --- _pipelined_cli -------------------------------------------------------
+
+
+class EchoingChannel:
+    """Echoes written lines prompt-prefixed and replies to show/echo commands."""
+
+    def __init__(self):
+        self.stream = b""
+
+    def write(self, data):
+        for line in data.decode().splitlines():
+            self.stream += ("sw1# " + line + "\n").encode()
+            if line.startswith("echo "):
+                self.stream += (line[5:] + "\n").encode()
+            elif line == "terminal length 0":
+                self.stream += b"Pagination disabled\n"
+            elif line.startswith("show "):
+                self.stream += ("OUTPUT-OF-" + line + "\n").encode()
+
+    def read_until(self, pattern):
+        match = pattern.search(self.stream)
+        assert match is not None, self.stream
+        output = self.stream[: match.start()]
+        self.stream = self.stream[match.end():]
+        return output.decode()
+
+
+class PipeliningDriver(FakeDriver):
+    __slots__ = ("chan",)
+
+    def __init__(self):
+        super().__init__()
+        self.chan = EchoingChannel()
+
+    def _write_channel(self, data):
+        self.chan.write(data)
+
+    def _read_until(self, pattern):
+        return self.chan.read_until(pattern)
+
+
+def test_pipelined_cli_attributes_outputs_correctly():
+    driver = PipeliningDriver()
+    commands = ["show clock", "show version", "show users"]
+    assert driver._pipelined_cli(commands) == {
+        command: "OUTPUT-OF-" + command for command in commands
+    }
+
+
+def test_pipelined_cli_keeps_multiline_output():
+    driver = PipeliningDriver()
+
+    def write(data):
+        for line in data.decode().splitlines():
+            driver.chan.stream += ("sw1# " + line + "\n").encode()
+            if line.startswith("echo "):
+                driver.chan.stream += (line[5:] + "\n").encode()
+            elif line.startswith("show "):
+                driver.chan.stream += b"line one\nline two\n"
+
+    driver.chan.write = write
+    assert driver._pipelined_cli(["show x"]) == {"show x": "line one\nline two"}
+
+
+# --- compare_config memoization ------------------------------------------
+
+
+def test_compare_config_memoizes_on_candidate_hash(driver):
+    driver.load_merge_candidate(config="interface Lo0")
+    assert driver.compare_config() == "diff #1"
+    assert driver.compare_config() == "diff #1"
+    assert driver.diffs_computed == 1
+
+
+def test_compare_config_recomputes_on_new_candidate(driver):
+    driver.load_merge_candidate(config="one")
+    driver.compare_config()
+    driver.load_merge_candidate(config="two")
+    assert driver.compare_config() == "diff #2"
+
+
+def test_commit_and_discard_invalidate_cache(driver):
+    driver.load_merge_candidate(config="one")
+    driver.compare_config()
+    driver.commit_config()
+    driver.load_merge_candidate(config="one")
+    assert driver.compare_config() == "diff #2"
+    driver.discard_config()
+    assert driver._cand_hash is None and driver._last_diff is None
+
+
+# --- _iter_config_payload -------------------------------------------------
+
+
+def test_iter_config_payload_chunks_file(driver, tmp_path):
+    path = tmp_path / "candidate.conf"
+    path.write_bytes(b"a" * 70000)
+    chunks = list(driver._iter_config_payload(filename=str(path)))
+    assert [len(chunk) for chunk in chunks] == [65536, 70000 - 65536]
+    assert b"".join(chunks) == b"a" * 70000
+
+
+def test_iter_config_payload_empty_file(driver, tmp_path):
+    path = tmp_path / "empty.conf"
+    path.write_bytes(b"")
+    assert list(driver._iter_config_payload(filename=str(path))) == []
+
+
+def test_iter_config_payload_string_and_precedence(driver, tmp_path):
+    assert b"".join(driver._iter_config_payload(config="abc", chunk=2)) == b"abc"
+    path = tmp_path / "candidate.conf"
+    path.write_bytes(b"from-file")
+    joined = b"".join(
+        driver._iter_config_payload(filename=str(path), config="from-string")
+    )
+    assert joined == b"from-file"
+
+
+# --- connection pool integration -----------------------------------------
+
+
+def test_use_pool_reuses_session_across_drivers():
+    first = FakeDriver(optional_args={"use_pool": True})
+    first.open()
+    session = first._session
+    first.close()
+    second = FakeDriver(optional_args={"use_pool": True})
+    second.open()
+    assert second._session is session
+    second._use_pool = False  # force a real teardown, keep the default pool clean
+    second.close()
+
+
+# --- open_many ------------------------------------------------------------
+
+
+class FlakyDriver(FakeDriver):
+    __slots__ = ()
+
+    def open(self):
+        if self.hostname == "unreachable":
+            raise ConnectionException("no route to host")
+        super().open()
+
+
+def test_open_many_returns_drivers_and_exceptions():
+    targets = [("a", "u", "p"), ("unreachable", "u", "p"), ("c", "u", "p")]
+    results = FlakyDriver.open_many(targets, concurrency=2)
+    assert results["a"].opened and results["c"].opened
+    assert isinstance(results["unreachable"], ConnectionException)
+
+
+def test_open_many_applies_common_and_per_target_kwargs():
+    targets = [("a", "u", "p", {"optional_args": {"port": 2222}})]
+    results = FakeDriver.open_many(targets, timeout=5)
+    assert results["a"].timeout == 5
+    assert results["a"].optional_args["port"] == 2222
+
+
+# --- context manager and exception handling -------------------------------
+
+
+def test_exit_close_error_does_not_mask_inner_exception():
+    class Breaking(FakeDriver):
+        __slots__ = ()
+
+        def close(self):
+            raise OSError("dead socket")
+
+    with pytest.raises(ValueError):
+        with Breaking():
+            raise ValueError("inner")
+
+
+def test_exit_propagates_close_error_on_clean_exit():
+    class Breaking(FakeDriver):
+        __slots__ = ()
+
+        def close(self):
+            raise OSError("dead socket")
+
+    with pytest.raises(OSError):
+        with Breaking():
+            pass
+
+
+def test_enter_preserves_traceback():
+    class Failing(FakeDriver):
+        __slots__ = ()
+
+        def open(self):
+            self._explode()
+
+        def _explode(self):
+            raise ConnectionException("boom")
+
+    with pytest.raises(ConnectionException) as excinfo:
+        with Failing():
+            pass
+    assert any(
+        frame.name == "_explode" for frame in excinfo.traceback
+    )
+
+
+def test_unknown_exception_in_open_warns_on_stderr(capsys):
+    weird = type("MysteryError", (Exception,), {})
+
+    class Failing(FakeDriver):
+        __slots__ = ()
+
+        def open(self):
+            raise weird()
+
+    with pytest.raises(weird):
+        with Failing():
+            pass
+    assert "MysteryError" in capsys.readouterr().err
+
+
+def test_known_exception_stays_quiet(driver, capsys):
+    with pytest.raises(KeyError):
+        with driver:
+            raise KeyError("known")
+    assert capsys.readouterr().err == ""
+
+
+# --- prompt handling ------------------------------------------------------
+
+
+def test_compile_prompt_and_read_until_prompt(driver):
+    driver._prompt_re = driver._compile_prompt("sw1.lab")
+    assert driver._prompt_re.search(b"output\nsw1.lab# ")
+    assert not driver._prompt_re.search(b"sw1.lab output")
+
+    class Chan:
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+
+        def recv(self, n):
+            return self.chunks.pop(0) if self.chunks else b""
+
+    out = driver._read_until_prompt(Chan([b"line1\n", b"line2\nsw1.lab>"]))
+    assert out == b"line1\nline2\nsw1.lab>"
+
+
+def test_detect_prompt(driver, monkeypatch):
+    class FakeSelect:
+        @staticmethod
+        def select(r, w, x, timeout):
+            return (r, [], [])
+
+    monkeypatch.setattr(base_module, "select", FakeSelect)
+
+    class Chan:
+        def __init__(self, payload):
+            self.payload = payload
+
+        def send(self, data):
+            pass
+
+        def recv(self, n):
+            payload, self.payload = self.payload, b""
+            return payload
+
+    assert driver._detect_prompt(Chan(b"Welcome\nsw1.lab-01# ")) == b"sw1.lab-01#"
+    with pytest.raises(ConnectionException):
+        driver._detect_prompt(Chan(b"%% garbage %%"), attempts=2)
+
+
+# --- keepalive and is_alive -----------------------------------------------
+
+
+def test_apply_keepalive_handles_both_signatures(driver):
+    calls = []
+
+    class ParamikoTransport:
+        def set_keepalive(self, interval):
+            calls.append(("paramiko", interval))
+
+    class AsyncsshConn:
+        def set_keepalive(self, interval, count_max):
+            calls.append(("asyncssh", interval, count_max))
+
+    driver._apply_keepalive(ParamikoTransport())
+    driver._apply_keepalive(AsyncsshConn())
+    assert calls == [("paramiko", 30), ("asyncssh", 30, 3)]
+
+
+def test_apply_keepalive_zero_interval_is_noop():
+    driver = FakeDriver(optional_args={"keepalive_interval": 0})
+
+    class Transport:
+        def set_keepalive(self, *args):
+            raise AssertionError("should not be called")
+
+    driver._apply_keepalive(Transport())
+
+
+def test_is_alive_uses_fresh_heartbeat(driver):
+    driver.probe_results = [False]
+    driver._note_heartbeat()
+    assert driver.is_alive() == {"is_alive": True}
+    assert driver.probe_results == [False]  # probe never consulted
+
+
+def test_is_alive_probes_when_stale(driver):
+    driver.probe_results = [True]
+    assert driver.is_alive() == {"is_alive": True}
+    assert driver.probe_results == []
+
+
+def test_close_clears_heartbeat(driver):
+    driver.open()
+    driver._note_heartbeat()
+    driver.close()
+    driver.probe_results = [False]
+    assert driver.is_alive() == {"is_alive": False}
+
+
+# --- channel lock ---------------------------------------------------------
+
+
+def test_locked_methods_serialize_across_threads():
+    import threading
+    import time as time_module
+
+    log = []
+
+    class SlowDriver(FakeDriver):
+        __slots__ = ()
+
+        @BaseNetworkDriver._locked
+        def _run_one(self, command):
+            log.append("start-" + command)
+            time_module.sleep(0.01)
+            log.append("end-" + command)
+            return command
+
+    driver = SlowDriver()
+    threads = [
+        threading.Thread(target=driver.cli, args=(["c%d" % i],)) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for i in range(0, len(log), 2):
+        assert log[i].replace("start", "") == log[i + 1].replace("end", "")